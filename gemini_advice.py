@@ -1,49 +1,114 @@
 import os
+import asyncio
+import functools
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-def get_aqi_category(aqi):
-    """Return AQI category and health implications"""
-    if aqi <= 50:
-        return "Good", "Air quality is satisfactory"
-    elif aqi <= 100:
-        return "Moderate", "Acceptable for most people"
-    elif aqi <= 150:
-        return "Unhealthy for Sensitive Groups", "People with respiratory conditions may experience symptoms"
-    elif aqi <= 200:
-        return "Unhealthy", "Everyone may begin to experience health effects"
-    elif aqi <= 300:
-        return "Very Unhealthy", "Health alert - everyone may experience serious effects"
-    else:
-        return "Hazardous", "Health warnings of emergency conditions"
+# Pooled keep-alive session so repeated Gemini calls reuse the TLS connection.
+# Transient errors are retried; the final response is returned so rate limits
+# still surface as HTTPError below. Read timeouts are not retried and
+# Retry-After is ignored, so a slow call still falls back after one 15s timeout.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        read=False,
+        allowed_methods=["POST"],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+))
 
-def get_advice(question: str, weather: dict, pollution: dict) -> str:
-    try:
-        # Use the correct model available in your API (v1 API with gemini-2.0-flash)
-        url = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
-        
-        # Get AQI category for better context
-        aqi_val = pollution.get('AQI', 0)
-        aqi_category, aqi_health = get_aqi_category(aqi_val)
-        
-        # Determine weather comfort level
-        temp = weather.get('Temperature (°C)', 0)
-        if temp > 35:
-            temp_desc = "very hot (heat stress risk)"
-        elif temp > 30:
-            temp_desc = "hot (stay hydrated)"
-        elif temp < 10:
-            temp_desc = "cold (risk of hypothermia)"
-        elif temp < 15:
-            temp_desc = "cool"
-        else:
-            temp_desc = "comfortable"
-        
-        # Create a sophisticated, context-aware prompt with role-playing
-        prompt = f"""You are Dr. Anika Sharma, an environmental health specialist with 15 years of experience advising people on weather and air quality impacts. You combine scientific expertise with practical, empathetic advice.
+HEADERS = {
+    "Content-Type": "application/json"
+}
+
+# Band lookup tables: np.searchsorted(CUTS, value) returns the band index, and a
+# value equal to a cut falls in the lower band (matching the `<=` thresholds).
+# Cuts for strict `<` thresholds are nudged just below the limit with np.nextafter.
+AQI_CUTS = np.array([50, 100, 150, 200, 300])
+AQI_LABELS = np.array([
+    "Good",
+    "Moderate",
+    "Unhealthy for Sensitive Groups",
+    "Unhealthy",
+    "Very Unhealthy",
+    "Hazardous"
+])
+AQI_HEALTH = np.array([
+    "Air quality is satisfactory",
+    "Acceptable for most people",
+    "People with respiratory conditions may experience symptoms",
+    "Everyone may begin to experience health effects",
+    "Health alert - everyone may experience serious effects",
+    "Health warnings of emergency conditions"
+])
+
+TEMP_CUTS = np.array([np.nextafter(10, -np.inf), np.nextafter(15, -np.inf), 30, 35])
+TEMP_DESCS = [
+    "cold (risk of hypothermia)",
+    "cool",
+    "comfortable",
+    "hot (stay hydrated)",
+    "very hot (heat stress risk)"
+]
+TEMP_ADVICE = [
+    "🌡️ **Cold Alert**: Bundle up in layers, cover extremities, and limit exposure to prevent hypothermia. Warm beverages recommended.",
+    "🌡️ **Cool Weather**: Light jacket recommended, especially for morning and evening hours.",
+    None,
+    "🌡️ **Hot Weather**: Stay well-hydrated (drink 3-4 liters of water), use SPF 30+ sunscreen, and schedule outdoor activities for early morning or evening.",
+    "🌡️ **Heat Warning**: Temperature is dangerously high. Risk of heat stroke and dehydration. Stay indoors during 11 AM - 4 PM, drink water every 30 minutes, and avoid strenuous activities."
+]
+
+FALLBACK_AQI_CUTS = np.array([50, 100, 150, 200])
+FALLBACK_AQI_ADVICE = [
+    "✅ **Excellent Air Quality** (AQI {:.0f}): Perfect conditions for all outdoor activities!",
+    "✅ **Good Air Quality** (AQI {:.0f}): Safe for outdoor activities.",
+    "⚠️ **Moderate Air Quality** (AQI {:.0f}): Sensitive individuals should reduce prolonged outdoor exertion. General population can proceed with normal activities but monitor symptoms.",
+    "⚠️ **Unhealthy for Sensitive Groups** (AQI {:.0f}): Children, elderly, pregnant women, and people with heart/lung conditions should stay indoors. Others should limit prolonged outdoor activities and consider wearing masks.",
+    "🚨 **Unhealthy Air Quality** (AQI {:.0f}): Avoid all outdoor activities. Keep windows closed, use air purifiers with HEPA filters, wear N95 masks if you must go outside. Particularly dangerous for children, elderly, and those with asthma/COPD."
+]
+
+PM25_CUTS = np.array([55, 75])
+PM25_ADVICE = [
+    None,
+    "😷 **High PM2.5** ({:.1f} μg/m³): Avoid outdoor exercise, wear masks outdoors, use air purifiers indoors.",
+    "😷 **Critical PM2.5 Levels** ({:.1f} μg/m³): Fine particles can penetrate deep into lungs. N95/N99 masks essential if going outdoors. Use indoor air purifiers."
+]
+
+HUMIDITY_CUTS = np.array([np.nextafter(30, -np.inf), 80])
+HUMIDITY_ADVICE = [
+    "💧 **Low Humidity** ({:.0f}%): Dry air can irritate respiratory system. Drink extra water, use moisturizer, and consider a humidifier indoors.",
+    None,
+    "💧 **High Humidity** ({:.0f}%): Muggy conditions increase heat stress. Stay in air-conditioned spaces, avoid heavy exercise, and stay hydrated."
+]
+
+WIND_CUTS = np.array([40, 50])
+WIND_ADVICE = [
+    None,
+    "💨 **Breezy Conditions** ({:.0f} km/h): Moderately strong winds. Secure outdoor items and be cautious with umbrellas.",
+    "💨 **Strong Winds** ({:.0f} km/h): High wind warning. Secure loose objects, avoid parking under trees, and be cautious while driving high-profile vehicles."
+]
+
+EXERCISE_ADVICE = [
+    "\n💪 **For Exercise**: Current conditions are NOT suitable for outdoor exercise. Consider indoor alternatives like gym workouts, yoga, or home exercises.",
+    "\n💪 **For Exercise**: Limit intensity and duration. Early morning (6-8 AM) offers better conditions. Stay hydrated throughout.",
+    "\n💪 **For Exercise**: Conditions are suitable for outdoor exercise. Remember to warm up and stay hydrated!"
+]
+
+# Context-aware prompt with role-playing, filled in by get_advice()
+PROMPT_TEMPLATE = """You are Dr. Anika Sharma, an environmental health specialist with 15 years of experience advising people on weather and air quality impacts. You combine scientific expertise with practical, empathetic advice.
 
 CONTEXT:
 Location: India
@@ -55,20 +120,20 @@ USER'S QUESTION:
 ENVIRONMENTAL CONDITIONS ANALYSIS:
 
 🌡️ WEATHER STATUS:
-• Temperature: {weather.get('Temperature (°C)', 'N/A')}°C ({temp_desc})
-• Humidity: {weather.get('Humidity (%)', 'N/A')}% {'(high - feels sticky)' if weather.get('Humidity (%)', 0) > 70 else '(moderate)' if weather.get('Humidity (%)', 0) > 40 else '(low - dry air)'}
-• Wind Speed: {weather.get('Wind Speed (km/h)', 'N/A')} km/h {'(breezy)' if weather.get('Wind Speed (km/h)', 0) > 20 else '(calm)'}
-• Pressure: {weather.get('Pressure (hPa)', 'N/A')} hPa
+• Temperature: {temperature}°C ({temp_desc})
+• Humidity: {humidity}% {humidity_desc}
+• Wind Speed: {wind_speed} km/h {wind_desc}
+• Pressure: {pressure} hPa
 
 🌫️ AIR QUALITY STATUS:
-• Overall AQI: {pollution.get('AQI', 'N/A')} - {aqi_category}
+• Overall AQI: {aqi} - {aqi_category}
   └─ Health Impact: {aqi_health}
-• Fine Particles (PM2.5): {pollution.get('PM2.5', 'N/A')} μg/m³ {'⚠️ HIGH' if pollution.get('PM2.5', 0) > 55 else '✓ acceptable' if pollution.get('PM2.5', 0) <= 35 else 'moderate'}
-• Coarse Particles (PM10): {pollution.get('PM10', 'N/A')} μg/m³
-• Nitrogen Dioxide (NO2): {pollution.get('NO2', 'N/A')} μg/m³
-• Sulfur Dioxide (SO2): {pollution.get('SO2', 'N/A')} μg/m³
-• Carbon Monoxide (CO): {pollution.get('CO', 'N/A')} mg/m³
-• Ozone (O3): {pollution.get('O3', 'N/A')} μg/m³
+• Fine Particles (PM2.5): {pm25} μg/m³ {pm25_desc}
+• Coarse Particles (PM10): {pm10} μg/m³
+• Nitrogen Dioxide (NO2): {no2} μg/m³
+• Sulfur Dioxide (SO2): {so2} μg/m³
+• Carbon Monoxide (CO): {co} mg/m³
+• Ozone (O3): {o3} μg/m³
 
 YOUR TASK:
 Provide personalized advice that:
@@ -82,141 +147,253 @@ Provide personalized advice that:
 Keep it concise (4-6 sentences) but informative. Focus on what matters most for their specific question.
 
 YOUR EXPERT ADVICE:"""
-        
-        # Prepare request body with optimized parameters
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.8,
-                "maxOutputTokens": 300,
-                "topP": 0.95,
-                "topK": 40,
-                "candidateCount": 1
-            },
-            "safetySettings": [
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE"
-                }
-            ]
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
+
+def band_index(cuts, value, nan_band):
+    """Return the band of value in cuts; NaN falls in nan_band, as with the plain threshold checks"""
+    return nan_band if np.isnan(value) else np.searchsorted(cuts, value)
+
+def display_value(value):
+    """Return a reading for the prompt, with missing readings shown as N/A"""
+    return 'N/A' if value is None else value
+
+def band_indices(cuts, values, nan_band):
+    """Vectorized band_index over an array of values"""
+    return np.where(np.isnan(values), nan_band, np.searchsorted(cuts, values))
+
+def get_aqi_category(aqi):
+    """Return AQI category and health implications"""
+    i = np.searchsorted(AQI_CUTS, aqi)
+    return str(AQI_LABELS[i]), str(AQI_HEALTH[i])
+
+def get_aqi_category_batch(aqi):
+    """Return arrays of AQI categories and health implications for an array of AQI values"""
+    i = np.searchsorted(AQI_CUTS, aqi)
+    return AQI_LABELS[i], AQI_HEALTH[i]
+
+def build_gemini_request(question: str, weather: dict, pollution: dict):
+    """Return the Gemini URL and request body for an advice question"""
+    # Use the correct model available in your API (v1 API with gemini-2.0-flash)
+    url = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+    
+    # Look up each reading once; a missing reading is shown as 'N/A' in the
+    # prompt and counts as 0 when picking its descriptor
+    temp = weather.get('Temperature (°C)')
+    humidity = weather.get('Humidity (%)')
+    wind_speed = weather.get('Wind Speed (km/h)')
+    aqi_val = pollution.get('AQI')
+    pm25 = pollution.get('PM2.5')
+    
+    # Get AQI category for better context
+    aqi_category, aqi_health = get_aqi_category(aqi_val or 0)
+    
+    # Determine weather comfort level
+    temp_desc = TEMP_DESCS[band_index(TEMP_CUTS, temp or 0, 2)]
+    
+    prompt = PROMPT_TEMPLATE.format_map({
+        "question": question,
+        "temperature": display_value(temp),
+        "temp_desc": temp_desc,
+        "humidity": display_value(humidity),
+        "humidity_desc": '(high - feels sticky)' if (humidity or 0) > 70 else '(moderate)' if (humidity or 0) > 40 else '(low - dry air)',
+        "wind_speed": display_value(wind_speed),
+        "wind_desc": '(breezy)' if (wind_speed or 0) > 20 else '(calm)',
+        "pressure": display_value(weather.get('Pressure (hPa)')),
+        "aqi": display_value(aqi_val),
+        "aqi_category": aqi_category,
+        "aqi_health": aqi_health,
+        "pm25": display_value(pm25),
+        "pm25_desc": '⚠️ HIGH' if (pm25 or 0) > 55 else '✓ acceptable' if (pm25 or 0) <= 35 else 'moderate',
+        "pm10": display_value(pollution.get('PM10')),
+        "no2": display_value(pollution.get('NO2')),
+        "so2": display_value(pollution.get('SO2')),
+        "co": display_value(pollution.get('CO')),
+        "o3": display_value(pollution.get('O3'))
+    })
+    
+    # Prepare request body with optimized parameters
+    data = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }],
+        "generationConfig": {
+            "temperature": 0.8,
+            "maxOutputTokens": 300,
+            "topP": 0.95,
+            "topK": 40,
+            "candidateCount": 1
+        },
+        "safetySettings": [
+            {
+                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+                "threshold": "BLOCK_NONE"
+            }
+        ]
+    }
+    return url, data
+
+
+def bucket(value, step=1):
+    """Round a reading to the nearest step for the advice cache key"""
+    if value is None or np.isnan(value):
+        return None
+    return round(value / step) * step
+
+
+@functools.lru_cache(maxsize=1024)
+def advice_cache_slot(question, temp, humidity, wind_speed, aqi, pm25):
+    """Return the LRU-cached slot holding Gemini advice for a question and bucketed conditions"""
+    return {}
+
+
+def get_advice_cache_slot(question: str, weather: dict, pollution: dict) -> dict:
+    """Return the cache slot shared by near-identical questions and conditions"""
+    return advice_cache_slot(
+        " ".join(question.lower().split()),
+        bucket(weather.get('Temperature (°C)')),
+        bucket(weather.get('Humidity (%)')),
+        bucket(weather.get('Wind Speed (km/h)')),
+        bucket(pollution.get('AQI'), 10),
+        bucket(pollution.get('PM2.5'))
+    )
+
+
+def extract_advice(result: dict, question: str, weather: dict, pollution: dict, cache_slot: dict = None) -> str:
+    """Return the generated text from a Gemini response, or fallback advice
+
+    Generated text is also stored in cache_slot; fallback advice never is.
+    """
+    try:
+        if 'candidates' in result and len(result['candidates']) > 0:
+            candidate = result['candidates'][0]
+            if 'content' in candidate and 'parts' in candidate['content']:
+                if len(candidate['content']['parts']) > 0:
+                    advice = candidate['content']['parts'][0]['text']
+                    if cache_slot is not None:
+                        cache_slot['advice'] = advice
+                    return advice
+        return generate_fallback_advice(question, weather, pollution, "⚠️ Unexpected API response format")
+    except (KeyError, IndexError, TypeError) as e:
+        return generate_fallback_advice(question, weather, pollution, f"⚠️ Error parsing response: {str(e)}")
+
+
+def http_error_message(status_code: int) -> str:
+    """Return a user-facing message for a failed Gemini request"""
+    if status_code == 429:
+        return "⚠️ Rate limit exceeded. Please try again in a moment."
+    elif status_code == 400:
+        return "⚠️ Invalid API request. Please check your API key."
+    return f"API Error: {status_code}"
+
+
+def get_advice(question: str, weather: dict, pollution: dict) -> str:
+    # Near-identical questions under near-identical conditions reuse earlier advice
+    cache_slot = get_advice_cache_slot(question, weather, pollution)
+    if 'advice' in cache_slot:
+        return cache_slot['advice']
+    
+    try:
+        url, data = build_gemini_request(question, weather, pollution)
         
         # Add timeout of 15 seconds for more detailed response
-        response = requests.post(url, json=data, headers=headers, timeout=15)
+        response = _SESSION.post(url, json=data, headers=HEADERS, timeout=15)
         response.raise_for_status()
         
-        result = response.json()
-        
-        # Extract the generated text with better error handling
-        try:
-            if 'candidates' in result and len(result['candidates']) > 0:
-                candidate = result['candidates'][0]
-                if 'content' in candidate and 'parts' in candidate['content']:
-                    if len(candidate['content']['parts']) > 0:
-                        return candidate['content']['parts'][0]['text']
-            return generate_fallback_advice(question, weather, pollution, "⚠️ Unexpected API response format")
-        except (KeyError, IndexError, TypeError) as e:
-            return generate_fallback_advice(question, weather, pollution, f"⚠️ Error parsing response: {str(e)}")
+        return extract_advice(response.json(), question, weather, pollution, cache_slot)
     
     except requests.exceptions.Timeout:
         return generate_fallback_advice(question, weather, pollution, "⏱️ API timeout - using fallback advice")
     
     except requests.exceptions.HTTPError as e:
-        error_msg = f"API Error: {e.response.status_code}"
-        if e.response.status_code == 429:
-            error_msg = "⚠️ Rate limit exceeded. Please try again in a moment."
-        elif e.response.status_code == 400:
-            error_msg = "⚠️ Invalid API request. Please check your API key."
-        return generate_fallback_advice(question, weather, pollution, error_msg)
+        return generate_fallback_advice(question, weather, pollution, http_error_message(e.response.status_code))
     
     except Exception as e:
         return generate_fallback_advice(question, weather, pollution, f"⚠️ Error: {str(e)[:100]}")
 
 
+async def get_advice_async(question: str, weather: dict, pollution: dict, client: httpx.AsyncClient) -> str:
+    """Async variant of get_advice that sends the request through a shared httpx client"""
+    # Near-identical questions under near-identical conditions reuse earlier advice
+    cache_slot = get_advice_cache_slot(question, weather, pollution)
+    if 'advice' in cache_slot:
+        return cache_slot['advice']
+    
+    try:
+        url, data = build_gemini_request(question, weather, pollution)
+        
+        response = await client.post(url, json=data, headers=HEADERS, timeout=15)
+        response.raise_for_status()
+        
+        return extract_advice(response.json(), question, weather, pollution, cache_slot)
+    
+    except httpx.TimeoutException:
+        return generate_fallback_advice(question, weather, pollution, "⏱️ API timeout - using fallback advice")
+    
+    except httpx.HTTPStatusError as e:
+        return generate_fallback_advice(question, weather, pollution, http_error_message(e.response.status_code))
+    
+    except Exception as e:
+        return generate_fallback_advice(question, weather, pollution, f"⚠️ Error: {str(e)[:100]}")
+
+
+async def batch_advice(items: list) -> list:
+    """Get advice for many (question, weather, pollution) dicts concurrently, in order"""
+    async with httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=32)) as client:
+        return await asyncio.gather(*[get_advice_async(**item, client=client) for item in items])
+
+
 def generate_fallback_advice(question: str, weather: dict, pollution: dict, error_msg: str = None) -> str:
     """Generate rule-based advice when API fails"""
-    advice = []
+    advice = generate_fallback_advice_batch(
+        [weather.get('Temperature (°C)', 0)],
+        [weather.get('Humidity (%)', 0)],
+        [weather.get('Wind Speed (km/h)', 0)],
+        [pollution.get('AQI', 0)],
+        [pollution.get('PM2.5', 0)],
+        question
+    )[0]
     
     if error_msg:
-        advice.append(f"{error_msg}\n")
-    
-    # Get comprehensive data
-    temp = weather.get('Temperature (°C)', 0)
-    humidity = weather.get('Humidity (%)', 0)
-    wind = weather.get('Wind Speed (km/h)', 0)
-    aqi = pollution.get('AQI', 0)
-    pm25 = pollution.get('PM2.5', 0)
-    
-    # Determine primary concern
-    concerns = []
-    
-    # Temperature analysis
-    if temp > 35:
-        concerns.append(("temperature", "🌡️ **Heat Warning**: Temperature is dangerously high. Risk of heat stroke and dehydration. Stay indoors during 11 AM - 4 PM, drink water every 30 minutes, and avoid strenuous activities."))
-    elif temp > 30:
-        concerns.append(("temperature", "🌡️ **Hot Weather**: Stay well-hydrated (drink 3-4 liters of water), use SPF 30+ sunscreen, and schedule outdoor activities for early morning or evening."))
-    elif temp < 10:
-        concerns.append(("temperature", "🌡️ **Cold Alert**: Bundle up in layers, cover extremities, and limit exposure to prevent hypothermia. Warm beverages recommended."))
-    elif temp < 15:
-        concerns.append(("temperature", "🌡️ **Cool Weather**: Light jacket recommended, especially for morning and evening hours."))
-    
-    # AQI analysis with specific guidance
-    if aqi > 200:
-        concerns.append(("aqi", "🚨 **Unhealthy Air Quality** (AQI {:.0f}): Avoid all outdoor activities. Keep windows closed, use air purifiers with HEPA filters, wear N95 masks if you must go outside. Particularly dangerous for children, elderly, and those with asthma/COPD.".format(aqi)))
-    elif aqi > 150:
-        concerns.append(("aqi", "⚠️ **Unhealthy for Sensitive Groups** (AQI {:.0f}): Children, elderly, pregnant women, and people with heart/lung conditions should stay indoors. Others should limit prolonged outdoor activities and consider wearing masks.".format(aqi)))
-    elif aqi > 100:
-        concerns.append(("aqi", "⚠️ **Moderate Air Quality** (AQI {:.0f}): Sensitive individuals should reduce prolonged outdoor exertion. General population can proceed with normal activities but monitor symptoms.".format(aqi)))
-    elif aqi <= 50:
-        concerns.append(("aqi", "✅ **Excellent Air Quality** (AQI {:.0f}): Perfect conditions for all outdoor activities!".format(aqi)))
-    else:
-        concerns.append(("aqi", "✅ **Good Air Quality** (AQI {:.0f}): Safe for outdoor activities.".format(aqi)))
-    
-    # PM2.5 specific warning
-    if pm25 > 75:
-        concerns.append(("pm25", "😷 **Critical PM2.5 Levels** ({:.1f} μg/m³): Fine particles can penetrate deep into lungs. N95/N99 masks essential if going outdoors. Use indoor air purifiers.".format(pm25)))
-    elif pm25 > 55:
-        concerns.append(("pm25", "😷 **High PM2.5** ({:.1f} μg/m³): Avoid outdoor exercise, wear masks outdoors, use air purifiers indoors.".format(pm25)))
-    
-    # Humidity analysis
-    if humidity > 80:
-        concerns.append(("humidity", "💧 **High Humidity** ({:.0f}%): Muggy conditions increase heat stress. Stay in air-conditioned spaces, avoid heavy exercise, and stay hydrated.".format(humidity)))
-    elif humidity < 30:
-        concerns.append(("humidity", "💧 **Low Humidity** ({:.0f}%): Dry air can irritate respiratory system. Drink extra water, use moisturizer, and consider a humidifier indoors.".format(humidity)))
-    
-    # Wind analysis
-    if wind > 50:
-        concerns.append(("wind", "💨 **Strong Winds** ({:.0f} km/h): High wind warning. Secure loose objects, avoid parking under trees, and be cautious while driving high-profile vehicles.".format(wind)))
-    elif wind > 40:
-        concerns.append(("wind", "💨 **Breezy Conditions** ({:.0f} km/h): Moderately strong winds. Secure outdoor items and be cautious with umbrellas.".format(wind)))
-    
-    # Compile advice prioritizing most severe concerns
-    if concerns:
-        # Sort by severity (aqi and temperature first)
-        priority_order = {"aqi": 0, "pm25": 1, "temperature": 2, "humidity": 3, "wind": 4}
-        concerns.sort(key=lambda x: priority_order.get(x[0], 99))
-        
-        for concern_type, concern_text in concerns[:3]:  # Top 3 concerns
-            advice.append(concern_text)
-    else:
-        advice.append("📊 **Conditions Normal**: Weather and air quality are within comfortable ranges. Standard seasonal precautions apply - stay hydrated and use sun protection during daytime.")
+        return f"{error_msg}\n\n\n{advice}"
+    return advice
+
+
+def generate_fallback_advice_batch(temps, humids, winds, aqis, pm25s, question: str = "") -> np.ndarray:
+    """Generate rule-based advice for many locations at once, returning an object array of messages"""
+    temps, humids, winds, aqis, pm25s = (np.asarray(v, dtype=float) for v in (temps, humids, winds, aqis, pm25s))
+    
+    # Band every reading with one vectorized lookup per table
+    aqi_bands = band_indices(FALLBACK_AQI_CUTS, aqis, 1)
+    
+    # Optional concerns in priority order (AQI always comes first)
+    optional = [
+        (PM25_ADVICE, band_indices(PM25_CUTS, pm25s, 0), pm25s),
+        (TEMP_ADVICE, band_indices(TEMP_CUTS, temps, 2), temps),
+        (HUMIDITY_ADVICE, band_indices(HUMIDITY_CUTS, humids, 1), humids),
+        (WIND_ADVICE, band_indices(WIND_CUTS, winds, 0), winds)
+    ]
     
     # Add personalized closing based on question context
     question_lower = question.lower()
+    exercise = None
     if any(word in question_lower for word in ['run', 'jog', 'exercise', 'workout', 'gym']):
-        if aqi > 150 or temp > 35:
-            advice.append("\n💪 **For Exercise**: Current conditions are NOT suitable for outdoor exercise. Consider indoor alternatives like gym workouts, yoga, or home exercises.")
-        elif aqi > 100 or temp > 30:
-            advice.append("\n💪 **For Exercise**: Limit intensity and duration. Early morning (6-8 AM) offers better conditions. Stay hydrated throughout.")
-        else:
-            advice.append("\n💪 **For Exercise**: Conditions are suitable for outdoor exercise. Remember to warm up and stay hydrated!")
-    
-    return "\n\n".join(advice)
\ No newline at end of file
+        exercise = np.select(
+            [(aqis > 150) | (temps > 35), (aqis > 100) | (temps > 30)],
+            [0, 1],
+            default=2
+        )
+    
+    advice = np.empty(len(aqis), dtype=object)
+    for i in range(len(aqis)):
+        # Top 3 concerns, most severe first
+        concerns = [FALLBACK_AQI_ADVICE[aqi_bands[i]].format(aqis[i])]
+        for table, bands, values in optional:
+            message = table[bands[i]]
+            if message and len(concerns) < 3:
+                concerns.append(message.format(values[i]))
+        if exercise is not None:
+            concerns.append(EXERCISE_ADVICE[exercise[i]])
+        advice[i] = "\n\n".join(concerns)
+    
+    return advice
@@ -0,0 +1,107 @@
+import numpy as np
+from numba import njit
+from sklearn.base import BaseEstimator, RegressorMixin
+
+@njit(fastmath=True, cache=True)
+def adam_update(param, grad, m, v, step, beta1, beta2, eps):
+    """Apply one Adam step to param in place"""
+    m[...] = beta1 * m + (1 - beta1) * grad
+    v[...] = beta2 * v + (1 - beta2) * grad * grad
+    param -= step * m / (np.sqrt(v) + eps)
+
+
+@njit(fastmath=True, cache=True)
+def train_mlp(X, y, W1, b1, W2, b2, W3, b3, lr, alpha, epochs, batch_size, seed):
+    """Mini-batch Adam on a two-hidden-layer ReLU network, updating weights in place"""
+    np.random.seed(seed)
+    n = X.shape[0]
+    zero = np.float32(0.0)
+    beta1 = np.float32(0.9)
+    beta2 = np.float32(0.999)
+    eps = np.float32(1e-8)
+
+    params = (W1, b1, W2, b2, W3, b3)
+    ms = (np.zeros_like(W1), np.zeros_like(b1), np.zeros_like(W2),
+          np.zeros_like(b2), np.zeros_like(W3), np.zeros_like(b3))
+    vs = (np.zeros_like(W1), np.zeros_like(b1), np.zeros_like(W2),
+          np.zeros_like(b2), np.zeros_like(W3), np.zeros_like(b3))
+    t = 0
+
+    for epoch in range(epochs):
+        order = np.random.permutation(n)
+        for start in range(0, n, batch_size):
+            idx = order[start:start + batch_size]
+            xb = X[idx]
+            yb = y[idx]
+            size = np.float32(xb.shape[0])
+
+            # Forward pass
+            h1 = np.maximum(np.dot(xb, W1) + b1, zero)
+            h2 = np.maximum(np.dot(h1, W2) + b2, zero)
+            out = np.dot(h2, W3) + b3
+
+            # Backward pass (squared error with L2 penalty alpha)
+            g3 = out - yb
+            g2 = np.dot(g3, W3.T) * (h2 > zero)
+            g1 = np.dot(g2, W2.T) * (h1 > zero)
+            grads = (
+                (np.dot(xb.T, g1) + alpha * W1) / size, g1.sum(axis=0) / size,
+                (np.dot(h1.T, g2) + alpha * W2) / size, g2.sum(axis=0) / size,
+                (np.dot(h2.T, g3) + alpha * W3) / size, g3.sum(axis=0) / size
+            )
+
+            t += 1
+            step = np.float32(lr * np.sqrt(1 - 0.999 ** t) / (1 - 0.9 ** t))
+            adam_update(params[0], grads[0], ms[0], vs[0], step, beta1, beta2, eps)
+            adam_update(params[1], grads[1], ms[1], vs[1], step, beta1, beta2, eps)
+            adam_update(params[2], grads[2], ms[2], vs[2], step, beta1, beta2, eps)
+            adam_update(params[3], grads[3], ms[3], vs[3], step, beta1, beta2, eps)
+            adam_update(params[4], grads[4], ms[4], vs[4], step, beta1, beta2, eps)
+            adam_update(params[5], grads[5], ms[5], vs[5], step, beta1, beta2, eps)
+
+
+class NumbaMLPRegressor(RegressorMixin, BaseEstimator):
+    """Multi-output MLP regressor trained by a Numba-compiled Adam loop
+
+    Uses the same optimizer settings as scikit-learn's MLPRegressor
+    (Adam, learning rate 1e-3, L2 penalty 1e-4) on two ReLU hidden layers.
+    """
+
+    def __init__(self, hidden_layer_sizes=(64, 64), learning_rate=1e-3, alpha=1e-4,
+                 max_iter=500, batch_size=256, random_state=None):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.learning_rate = learning_rate
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        if len(self.hidden_layer_sizes) != 2:
+            raise ValueError("NumbaMLPRegressor supports exactly two hidden layers")
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        y = np.ascontiguousarray(y.reshape(len(y), -1))
+
+        # He initialization
+        rng = np.random.default_rng(self.random_state)
+        sizes = [X.shape[1], *self.hidden_layer_sizes, y.shape[1]]
+        self.coefs_ = [
+            (rng.standard_normal((n_in, n_out)) * np.sqrt(2 / n_in)).astype(np.float32)
+            for n_in, n_out in zip(sizes[:-1], sizes[1:])
+        ]
+        self.intercepts_ = [np.zeros(n_out, dtype=np.float32) for n_out in sizes[1:]]
+
+        (W1, W2, W3), (b1, b2, b3) = self.coefs_, self.intercepts_
+        seed = int(rng.integers(2**31 - 1))
+        train_mlp(X, y, W1, b1, W2, b2, W3, b3, self.learning_rate, np.float32(self.alpha),
+                  self.max_iter, self.batch_size, seed)
+        return self
+
+    def predict(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        for W, b in zip(self.coefs_[:-1], self.intercepts_[:-1]):
+            h = np.maximum(h @ W + b, 0)
+        out = h @ self.coefs_[-1] + self.intercepts_[-1]
+        return out if out.shape[1] > 1 else out.ravel()
@@ -5,7 +5,7 @@ import numpy as np
 import joblib
 import plotly.express as px
 import plotly.graph_objects as go
-from gemini_advice import get_advice
+from gemini_advice import get_advice, AQI_CUTS, AQI_LABELS
 
 # Page Configuration
 st.set_page_config(
@@ -33,10 +33,16 @@ weather_model, weather_scaler, pollution_model, pollution_scaler = load_models()
 # ------------------------
 # Load city coordinates
 # ------------------------
+COORDS_DTYPES = {
+    "city": "string",
+    "latitude": "float32",
+    "longitude": "float32"
+}
+
 @st.cache_data
 def load_city_data():
     try:
-        coords = pd.read_csv("data/india_cities_latlon.csv")
+        coords = pd.read_csv("data/india_cities_latlon.csv", engine="pyarrow", dtype=COORDS_DTYPES)
         return coords
     except Exception as e:
         st.error(f"Error loading city data: {e}")
@@ -44,36 +50,283 @@ def load_city_data():
 
 coords = load_city_data()
 
+# Raw column arrays, extracted from the frame once per process
+@st.cache_resource
+def city_arrays():
+    return (
+        coords['city'].to_numpy(),
+        coords['latitude'].to_numpy(np.float32),
+        coords['longitude'].to_numpy(np.float32)
+    )
+
+@st.cache_resource
+def city_index():
+    names, lats, lons = city_arrays()
+    return dict(zip(names, zip(lats, lons)))
+
+@st.cache_data
+def city_list():
+    return city_arrays()[0].tolist()
+
+@st.cache_data
+def cities_sorted():
+    return coords[['city', 'latitude', 'longitude']].sort_values('city').reset_index(drop=True)
+
+# ------------------------
+# Cached model predictions
+# ------------------------
+# StandardScaler parameters as float32, so scaling is one fused NumPy expression
+@st.cache_resource
+def scaler_params():
+    return (
+        (weather_scaler.mean_.astype(np.float32), weather_scaler.scale_.astype(np.float32)),
+        (pollution_scaler.mean_.astype(np.float32), pollution_scaler.scale_.astype(np.float32))
+    )
+
+@st.cache_data(show_spinner=False)
+def predict(cities, day, month, year):
+    # One float32 (N, 5) batch per call, filled in place; rows follow the order of cities
+    X_batch = np.empty((len(cities), 5), dtype=np.float32)
+    X_batch[:, :2] = [city_index()[city] for city in cities]
+    X_batch[:, 2:] = (day, month, year)
+    (weather_mean, weather_scale), (pollution_mean, pollution_scale) = scaler_params()
+    weather_pred = weather_model.predict((X_batch - weather_mean) / weather_scale)
+    pollution_pred = pollution_model.predict((X_batch - pollution_mean) / pollution_scale)
+    return weather_pred, pollution_pred
+
+# ------------------------
+# Cached base map (all cities + layout)
+# ------------------------
+# Above this many cities the overview is drawn as a density layer instead of one marker per city
+DENSITY_MAP_MIN_CITIES = 1000
+
+@st.cache_resource
+def base_map():
+    names, lats, lons = city_arrays()
+    fig = go.Figure()
+    
+    if len(names) > DENSITY_MAP_MIN_CITIES:
+        # Aggregate all cities into a heat layer; cost follows the visible area, not the city count
+        fig.add_trace(go.Densitymap(
+            lon=lons,
+            lat=lats,
+            radius=10,
+            colorscale='Blues',
+            showscale=False,
+            hoverinfo='skip',
+            name='All Cities'
+        ))
+    else:
+        # Add all cities as markers (WebGL tile map, no per-marker SVG)
+        fig.add_trace(go.Scattermap(
+            lon=lons,
+            lat=lats,
+            text=names,
+            mode='markers',
+            marker=dict(
+                size=8,
+                color='darkblue',
+                opacity=0.7
+            ),
+            hovertemplate='<b>%{text}</b><br>Lat: %{lat:.2f}<br>Lon: %{lon:.2f}<extra></extra>',
+            name='All Cities'
+        ))
+    
+    # Configure map layout focused on India
+    fig.update_layout(
+        map=dict(
+            style='open-street-map',
+            center=dict(lat=20.5937, lon=78.9629),
+            zoom=3.5
+        ),
+        height=550,
+        margin=dict(l=0, r=0, t=0, b=0),
+        # Keep the user's pan/zoom when only the selected-city trace changes
+        uirevision='city-map',
+        showlegend=True,
+        legend=dict(x=0.01, y=0.99, bgcolor='rgba(255,255,255,0.9)')
+    )
+    return fig
+
+# ------------------------
+# Cached AQI gauge (static axis, steps and layout)
+# ------------------------
+@st.cache_resource
+def gauge_template():
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        title={'text': "Air Quality Index (AQI)", 'font': {'size': 26}},
+        delta={'reference': 50, 'increasing': {'color': "red"}},
+        gauge={
+            'axis': {'range': [None, 500], 'tickwidth': 2, 'tickcolor': "darkblue"},
+            'bar': {'thickness': 0.3},
+            'bgcolor': "white",
+            'borderwidth': 3,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 50], 'color': "lightgreen"},
+                {'range': [50, 100], 'color': "yellow"},
+                {'range': [100, 150], 'color': "orange"},
+                {'range': [150, 200], 'color': "red"},
+                {'range': [200, 300], 'color': "purple"},
+                {'range': [300, 500], 'color': "maroon"}
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 4},
+                'thickness': 0.8
+            }
+        }
+    ))
+    fig_gauge.update_layout(
+        height=350,
+        margin=dict(l=20, r=20, t=50, b=20),
+        font={'size': 16}
+    )
+    return fig_gauge
+
+# ------------------------
+# Cached comparison table HTML
+# ------------------------
+# Keyed on (cities, day, month, year) only; the leading underscore keeps Streamlit from hashing the frame
+@st.cache_data(show_spinner=False)
+def styled_comparison(comparison_key, _df_comparison):
+    return _df_comparison.style.background_gradient(cmap='RdYlGn_r', subset=['AQI']).format(precision=2).to_html()
+
 # ------------------------
 # Helper: AQI color coding
 # ------------------------
+# One entry per band of AQI_CUTS; works on a single AQI or an array of them
+AQI_COLORS = np.array(['green', 'yellow', 'orange', 'red', 'purple', 'maroon'])
+
 def aqi_color(aqi):
-    if aqi <= 50:
-        return 'green'
-    elif aqi <= 100:
-        return 'yellow'
-    elif aqi <= 150:
-        return 'orange'
-    elif aqi <= 200:
-        return 'red'
-    elif aqi <= 300:
-        return 'purple'
-    else:
-        return 'maroon'
+    return AQI_COLORS[np.searchsorted(AQI_CUTS, aqi)]
 
 def aqi_category(aqi):
-    if aqi <= 50:
-        return 'Good'
-    elif aqi <= 100:
-        return 'Moderate'
-    elif aqi <= 150:
-        return 'Unhealthy for Sensitive Groups'
-    elif aqi <= 200:
-        return 'Unhealthy'
-    elif aqi <= 300:
-        return 'Very Unhealthy'
-    else:
-        return 'Hazardous'
+    return AQI_LABELS[np.searchsorted(AQI_CUTS, aqi)]
+
+# ------------------------
+# Prediction panel (reruns on its own, not with the whole page)
+# ------------------------
+@st.fragment
+def prediction_panel(city, day, month, year):
+    # Input section
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("#### 💬 Ask AI for Personalized Advice")
+        question = st.text_area(
+            "Type your question here:",
+            placeholder="e.g., Should I go for a run today? Is it safe for my kids to play outside? Can I go cycling?",
+            height=120
+        )
+    
+    with col2:
+        st.markdown("#### ⚙️ Quick Actions")
+        st.info(f"📍 **City:** {city}\n\n📅 **Date:** {day}/{month}/{year}")
+        
+        if st.button("← Change City/Date", use_container_width=True):
+            st.info("👈 Use sidebar to navigate to 'City Selection & Map'")
+    
+    st.markdown("---")
+    
+    # Predict button
+    if st.button("🔮 Get Predictions & AI Advice", type="primary", use_container_width=True):
+        with st.spinner("🔄 Analyzing weather and pollution data..."):
+            city_latlon = city_index().get(city)
+            if city_latlon is None:
+                st.error(f"❌ City {city} not found!")
+            else:
+                try:
+                    # Reuse the last predictions while the city and date are unchanged
+                    pred_key = (city, day, month, year)
+                    if st.session_state.get('last_pred_key') != pred_key:
+                        weather_batch, pollution_batch = predict((city,), day, month, year)
+
+                        # Weather prediction
+                        weather_pred = weather_batch[0]
+                        weather_data = {
+                            "Temperature (°C)": round(weather_pred[0], 2),
+                            "Humidity (%)": round(weather_pred[1], 2),
+                            "Wind Speed (km/h)": round(weather_pred[2], 2),
+                            "Pressure (hPa)": round(weather_pred[3], 2)
+                        }
+
+                        # Pollution prediction
+                        pollution_pred = pollution_batch[0]
+                        pollution_cols = ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3', 'AQI']
+                        pollution_data = {col: round(val, 2) for col, val in zip(pollution_cols, pollution_pred)}
+
+                        st.session_state['last_pred'] = (weather_data, pollution_data)
+                        st.session_state['last_pred_key'] = pred_key
+
+                    weather_data, pollution_data = st.session_state['last_pred']
+
+                    st.success("✅ Predictions Generated Successfully!")
+                    st.markdown("---")
+
+                    # Display results in columns
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        # Display Weather
+                        st.markdown("### 🌤️ Weather Forecast")
+                        metric_col1, metric_col2 = st.columns(2)
+                        with metric_col1:
+                            st.metric("🌡️ Temperature", f"{weather_data['Temperature (°C)']}°C")
+                            st.metric("💧 Humidity", f"{weather_data['Humidity (%)']}%")
+                        with metric_col2:
+                            st.metric("💨 Wind Speed", f"{weather_data['Wind Speed (km/h)']} km/h")
+                            st.metric("🔽 Pressure", f"{weather_data['Pressure (hPa)']} hPa")
+                    
+                    with col2:
+                        # Display Pollution with AQI color
+                        st.markdown("### 🌫️ Air Quality")
+                        aqi_val = pollution_data['AQI']
+                        st.markdown(
+                            f"**AQI:** <span style='color:{aqi_color(aqi_val)}; font-weight:bold; font-size:32px'>"
+                            f"{aqi_val}</span> - {aqi_category(aqi_val)}", 
+                            unsafe_allow_html=True
+                        )
+                        
+                        # Display pollution data in a compact format
+                        poll_col1, poll_col2, poll_col3 = st.columns(3)
+                        with poll_col1:
+                            st.metric("PM2.5", f"{pollution_data['PM2.5']}")
+                            st.metric("PM10", f"{pollution_data['PM10']}")
+                        with poll_col2:
+                            st.metric("NO2", f"{pollution_data['NO2']}")
+                            st.metric("SO2", f"{pollution_data['SO2']}")
+                        with poll_col3:
+                            st.metric("CO", f"{pollution_data['CO']}")
+                            st.metric("O3", f"{pollution_data['O3']}")
+                    
+                    st.markdown("---")
+                    
+                    # Create a pollution gauge chart
+                    st.markdown("### 📊 Air Quality Index Meter")
+                    # Copy the cached gauge and fill in only the AQI-dependent parts
+                    fig_gauge = go.Figure(gauge_template())
+                    fig_gauge.update_traces(
+                        value=aqi_val,
+                        gauge_bar_color=str(aqi_color(aqi_val)),
+                        gauge_threshold_value=aqi_val
+                    )
+                    st.plotly_chart(fig_gauge, use_container_width=True)
+
+                    st.markdown("---")
+
+                    # Gemini advice
+                    if question.strip():
+                        st.markdown("### 💡 AI-Powered Personalized Advice")
+                        with st.spinner("🤖 Consulting AI health advisor..."):
+                            advice = get_advice(question, weather_data, pollution_data)
+                            st.info(advice)
+                    else:
+                        st.info("💬 **Tip:** Ask a question above to get personalized health and safety recommendations based on current conditions!")
+
+                except Exception as e:
+                    st.error(f"❌ Error during prediction: {e}")
+                    st.exception(e)
 
 # ------------------------
 # Sidebar - Only Navigation
@@ -193,7 +446,7 @@ elif page == "📍 City Selection & Map":
     
     with col1:
         st.markdown("#### 🌆 Select City")
-        city = st.selectbox("Choose a city:", coords['city'].tolist(), key="city_select")
+        city = st.selectbox("Choose a city:", city_list(), key="city_select")
         
         st.markdown("#### 📅 Select Date")
         col_a, col_b = st.columns(2)
@@ -204,86 +457,42 @@ elif page == "📍 City Selection & Map":
             year = st.number_input("Year", min_value=2025, max_value=2030, value=2025)
         
         # Show selected city info
-        city_row = coords[coords['city'] == city]
-        if not city_row.empty:
-            st.success(f"📍 **Selected: {city}**")
-            st.info(f"🌐 Latitude: {city_row['latitude'].values[0]:.4f}°\n\n🌐 Longitude: {city_row['longitude'].values[0]:.4f}°")
-            
-            st.markdown("---")
-            st.metric("📅 Selected Date", f"{day}/{month}/{year}")
+        lat, lon = city_index()[city]
+        st.success(f"📍 **Selected: {city}**")
+        st.info(f"🌐 Latitude: {lat:.4f}°\n\n🌐 Longitude: {lon:.4f}°")
+        
+        st.markdown("---")
+        st.metric("📅 Selected Date", f"{day}/{month}/{year}")
     
     with col2:
         st.markdown("#### 🗺️ Interactive Map of Indian Cities")
         
-        # Create an interactive map with all cities
-        fig = go.Figure()
+        # Copy the cached base map so the shared figure is never mutated
+        fig = go.Figure(base_map())
         
-        # Add all cities as markers
-        fig.add_trace(go.Scattergeo(
-            lon=coords['longitude'],
-            lat=coords['latitude'],
-            text=coords['city'],
-            mode='markers',
+        # Highlight selected city
+        fig.add_trace(go.Scattermap(
+            lon=[lon],
+            lat=[lat],
+            text=[city],
+            mode='markers+text',
             marker=dict(
-                size=8,
-                color='lightblue',
-                line=dict(width=1, color='darkblue'),
-                opacity=0.7
+                size=20,
+                color='red'
             ),
-            hovertemplate='<b>%{text}</b><br>Lat: %{lat:.2f}<br>Lon: %{lon:.2f}<extra></extra>',
-            name='All Cities'
+            textposition="top center",
+            textfont=dict(size=16, color='red', family='Open Sans Bold'),
+            hovertemplate='<b>SELECTED: %{text}</b><br>Lat: %{lat:.2f}<br>Lon: %{lon:.2f}<extra></extra>',
+            name='Selected City'
         ))
         
-        # Highlight selected city
-        if not city_row.empty:
-            fig.add_trace(go.Scattergeo(
-                lon=[city_row['longitude'].values[0]],
-                lat=[city_row['latitude'].values[0]],
-                text=[city],
-                mode='markers+text',
-                marker=dict(
-                    size=20,
-                    color='red',
-                    symbol='star',
-                    line=dict(width=3, color='darkred')
-                ),
-                textposition="top center",
-                textfont=dict(size=16, color='red', family='Arial Black'),
-                hovertemplate='<b>SELECTED: %{text}</b><br>Lat: %{lat:.2f}<br>Lon: %{lon:.2f}<extra></extra>',
-                name='Selected City'
-            ))
-        
-        # Configure map layout focused on India
-        fig.update_geos(
-            scope='asia',
-            center=dict(lat=20.5937, lon=78.9629),
-            projection_type='natural earth',
-            showland=True,
-            landcolor='rgb(243, 243, 243)',
-            coastlinecolor='rgb(204, 204, 204)',
-            showlakes=True,
-            lakecolor='rgb(200, 230, 255)',
-            showcountries=True,
-            countrycolor='rgb(204, 204, 204)',
-            lataxis_range=[6, 37],
-            lonaxis_range=[68, 98]
-        )
-        
-        fig.update_layout(
-            height=550,
-            margin=dict(l=0, r=0, t=0, b=0),
-            showlegend=True,
-            legend=dict(x=0.01, y=0.99, bgcolor='rgba(255,255,255,0.9)')
-        )
-        
         st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("---")
     
     # Display cities list
     with st.expander("📋 View All Available Cities"):
-        cities_df = coords[['city', 'latitude', 'longitude']].sort_values('city')
-        st.dataframe(cities_df, use_container_width=True, height=400)
+        st.dataframe(cities_sorted(), use_container_width=True, height=400)
     
     # Store selections in session state
     st.session_state['selected_city'] = city
@@ -296,7 +505,7 @@ elif page == "🔮 Predictions & Advice":
     st.title("🔮 Weather & Pollution Predictions")
     
     # Get selections from session state or use defaults
-    city = st.session_state.get('selected_city', coords['city'].tolist()[0])
+    city = st.session_state.get('selected_city', city_list()[0])
     day = st.session_state.get('selected_day', 15)
     month = st.session_state.get('selected_month', 10)
     year = st.session_state.get('selected_year', 2025)
@@ -305,146 +514,7 @@ elif page == "🔮 Predictions & Advice":
     
     st.markdown("---")
     
-    # Input section
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.markdown("#### 💬 Ask AI for Personalized Advice")
-        question = st.text_area(
-            "Type your question here:",
-            placeholder="e.g., Should I go for a run today? Is it safe for my kids to play outside? Can I go cycling?",
-            height=120
-        )
-    
-    with col2:
-        st.markdown("#### ⚙️ Quick Actions")
-        st.info(f"📍 **City:** {city}\n\n📅 **Date:** {day}/{month}/{year}")
-        
-        if st.button("← Change City/Date", use_container_width=True):
-            st.info("👈 Use sidebar to navigate to 'City Selection & Map'")
-    
-    st.markdown("---")
-    
-    # Predict button
-    if st.button("🔮 Get Predictions & AI Advice", type="primary", use_container_width=True):
-        with st.spinner("🔄 Analyzing weather and pollution data..."):
-            city_row = coords[coords['city'] == city]
-            if city_row.empty:
-                st.error(f"❌ City {city} not found!")
-            else:
-                lat = city_row['latitude'].values[0]
-                lon = city_row['longitude'].values[0]
-
-                try:
-                    # Prepare features for prediction
-                    X_input = np.array([[lat, lon, day, month, year]])
-
-                    # Weather prediction
-                    X_weather_scaled = weather_scaler.transform(X_input)
-                    weather_pred = weather_model.predict(X_weather_scaled)[0]
-                    weather_data = {
-                        "Temperature (°C)": round(weather_pred[0], 2),
-                        "Humidity (%)": round(weather_pred[1], 2),
-                        "Wind Speed (km/h)": round(weather_pred[2], 2),
-                        "Pressure (hPa)": round(weather_pred[3], 2)
-                    }
-
-                    # Pollution prediction
-                    X_pollution_scaled = pollution_scaler.transform(X_input)
-                    pollution_pred = pollution_model.predict(X_pollution_scaled)[0]
-                    pollution_cols = ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3', 'AQI']
-                    pollution_data = {col: round(val, 2) for col, val in zip(pollution_cols, pollution_pred)}
-
-                    st.success("✅ Predictions Generated Successfully!")
-                    st.markdown("---")
-
-                    # Display results in columns
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Display Weather
-                        st.markdown("### 🌤️ Weather Forecast")
-                        metric_col1, metric_col2 = st.columns(2)
-                        with metric_col1:
-                            st.metric("🌡️ Temperature", f"{weather_data['Temperature (°C)']}°C")
-                            st.metric("💧 Humidity", f"{weather_data['Humidity (%)']}%")
-                        with metric_col2:
-                            st.metric("💨 Wind Speed", f"{weather_data['Wind Speed (km/h)']} km/h")
-                            st.metric("🔽 Pressure", f"{weather_data['Pressure (hPa)']} hPa")
-                    
-                    with col2:
-                        # Display Pollution with AQI color
-                        st.markdown("### 🌫️ Air Quality")
-                        aqi_val = pollution_data['AQI']
-                        st.markdown(
-                            f"**AQI:** <span style='color:{aqi_color(aqi_val)}; font-weight:bold; font-size:32px'>"
-                            f"{aqi_val}</span> - {aqi_category(aqi_val)}", 
-                            unsafe_allow_html=True
-                        )
-                        
-                        # Display pollution data in a compact format
-                        poll_col1, poll_col2, poll_col3 = st.columns(3)
-                        with poll_col1:
-                            st.metric("PM2.5", f"{pollution_data['PM2.5']}")
-                            st.metric("PM10", f"{pollution_data['PM10']}")
-                        with poll_col2:
-                            st.metric("NO2", f"{pollution_data['NO2']}")
-                            st.metric("SO2", f"{pollution_data['SO2']}")
-                        with poll_col3:
-                            st.metric("CO", f"{pollution_data['CO']}")
-                            st.metric("O3", f"{pollution_data['O3']}")
-                    
-                    st.markdown("---")
-                    
-                    # Create a pollution gauge chart
-                    st.markdown("### 📊 Air Quality Index Meter")
-                    fig_gauge = go.Figure(go.Indicator(
-                        mode="gauge+number+delta",
-                        value=aqi_val,
-                        title={'text': "Air Quality Index (AQI)", 'font': {'size': 26}},
-                        delta={'reference': 50, 'increasing': {'color': "red"}},
-                        gauge={
-                            'axis': {'range': [None, 500], 'tickwidth': 2, 'tickcolor': "darkblue"},
-                            'bar': {'color': aqi_color(aqi_val), 'thickness': 0.3},
-                            'bgcolor': "white",
-                            'borderwidth': 3,
-                            'bordercolor': "gray",
-                            'steps': [
-                                {'range': [0, 50], 'color': "lightgreen"},
-                                {'range': [50, 100], 'color': "yellow"},
-                                {'range': [100, 150], 'color': "orange"},
-                                {'range': [150, 200], 'color': "red"},
-                                {'range': [200, 300], 'color': "purple"},
-                                {'range': [300, 500], 'color': "maroon"}
-                            ],
-                            'threshold': {
-                                'line': {'color': "black", 'width': 4},
-                                'thickness': 0.8,
-                                'value': aqi_val
-                            }
-                        }
-                    ))
-                    fig_gauge.update_layout(
-                        height=350,
-                        margin=dict(l=20, r=20, t=50, b=20),
-                        font={'size': 16}
-                    )
-                    st.plotly_chart(fig_gauge, use_container_width=True)
-
-                    st.markdown("---")
-
-                    # Gemini advice
-                    if question.strip():
-                        st.markdown("### 💡 AI-Powered Personalized Advice")
-                        with st.spinner("🤖 Consulting AI health advisor..."):
-                            advice = get_advice(question, weather_data, pollution_data)
-                            st.info(advice)
-                    else:
-                        st.info("💬 **Tip:** Ask a question above to get personalized health and safety recommendations based on current conditions!")
-
-                except Exception as e:
-                    st.error(f"❌ Error during prediction: {e}")
-                    st.exception(e)
+    prediction_panel(city, day, month, year)
 
 # ==================== CITY COMPARISON PAGE ====================
 elif page == "📊 City Comparison":
@@ -465,10 +535,11 @@ elif page == "📊 City Comparison":
     col1, col2 = st.columns([2, 1])
     
     with col1:
+        cities = city_list()
         selected_cities = st.multiselect(
             "Choose 2-6 cities:",
-            coords['city'].tolist(),
-            default=[coords['city'].tolist()[0], coords['city'].tolist()[min(1, len(coords)-1)]] if len(coords) > 1 else [coords['city'].tolist()[0]],
+            cities,
+            default=cities[:2],
             max_selections=6
         )
     
@@ -481,116 +552,77 @@ elif page == "📊 City Comparison":
     st.markdown("---")
     
     if len(selected_cities) > 0 and st.button("🔍 Compare Selected Cities", type="primary", use_container_width=True):
-        comparison_data = []
+        # Reuse the last comparison while the cities and date are unchanged
+        comparison_key = (tuple(selected_cities), day, month, year)
+        if st.session_state.get('last_comparison_key') != comparison_key:
+            with st.spinner(f"🔄 Generating predictions for {len(selected_cities)} cities..."):
+                weather_pred, pollution_pred = predict(tuple(selected_cities), day, month, year)
+            
+                df_comparison = pd.DataFrame({
+                    'City': selected_cities,
+                    'Temperature (°C)': weather_pred[:, 0].round(2),
+                    'Humidity (%)': weather_pred[:, 1].round(2),
+                    'Wind Speed (km/h)': weather_pred[:, 2].round(2),
+                    'AQI': pollution_pred[:, 6].round(2),
+                    'PM2.5': pollution_pred[:, 0].round(2),
+                    'PM10': pollution_pred[:, 1].round(2)
+                })
+            
+            st.session_state['last_comparison'] = df_comparison
+            st.session_state['last_comparison_key'] = comparison_key
         
-        with st.spinner(f"🔄 Generating predictions for {len(selected_cities)} cities..."):
-            for comp_city in selected_cities:
-                city_row = coords[coords['city'] == comp_city]
-                if not city_row.empty:
-                    lat = city_row['latitude'].values[0]
-                    lon = city_row['longitude'].values[0]
-                    
-                    X_input = np.array([[lat, lon, day, month, year]])
-                    
-                    # Weather prediction
-                    X_weather_scaled = weather_scaler.transform(X_input)
-                    weather_pred = weather_model.predict(X_weather_scaled)[0]
-                    
-                    # Pollution prediction
-                    X_pollution_scaled = pollution_scaler.transform(X_input)
-                    pollution_pred = pollution_model.predict(X_pollution_scaled)[0]
-                    
-                    comparison_data.append({
-                        'City': comp_city,
-                        'Temperature (°C)': round(weather_pred[0], 2),
-                        'Humidity (%)': round(weather_pred[1], 2),
-                        'Wind Speed (km/h)': round(weather_pred[2], 2),
-                        'AQI': round(pollution_pred[6], 2),
-                        'PM2.5': round(pollution_pred[0], 2),
-                        'PM10': round(pollution_pred[1], 2)
-                    })
+        df_comparison = st.session_state['last_comparison']
         
-        if comparison_data:
-            df_comparison = pd.DataFrame(comparison_data)
-            
+        if not df_comparison.empty:
             st.success(f"✅ Comparison completed for {len(selected_cities)} cities!")
             st.markdown("---")
             
             # Display comparison table
             st.markdown("### 📋 Comparison Table")
-            st.dataframe(
-                df_comparison.style.background_gradient(cmap='RdYlGn_r', subset=['AQI']).format(precision=2),
-                use_container_width=True,
-                height=min(400, 50 + len(df_comparison) * 35)
-            )
+            st.html(styled_comparison(comparison_key, df_comparison))
             
             st.markdown("---")
             
             # Create comparison charts
             st.markdown("### 📈 Visual Comparison")
             
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Temperature comparison
-                fig_temp = px.bar(
-                    df_comparison, 
-                    x='City', 
-                    y='Temperature (°C)', 
-                    title='🌡️ Temperature Comparison',
-                    color='Temperature (°C)',
-                    color_continuous_scale='RdYlBu_r',
-                    text='Temperature (°C)'
-                )
-                fig_temp.update_traces(texttemplate='%{text:.1f}°C', textposition='outside')
-                fig_temp.update_layout(showlegend=False, height=400)
-                st.plotly_chart(fig_temp, use_container_width=True)
-            
-            with col2:
-                # AQI comparison
-                fig_aqi = px.bar(
-                    df_comparison, 
-                    x='City', 
-                    y='AQI',
-                    title='🌫️ Air Quality Index Comparison',
-                    color='AQI',
-                    color_continuous_scale=['green', 'yellow', 'orange', 'red', 'purple'],
-                    text='AQI'
-                )
-                fig_aqi.update_traces(texttemplate='%{text:.0f}', textposition='outside')
-                fig_aqi.update_layout(showlegend=False, height=400)
-                st.plotly_chart(fig_aqi, use_container_width=True)
-            
-            # PM2.5 and Humidity comparison
-            col3, col4 = st.columns(2)
-            
-            with col3:
-                fig_pm25 = px.bar(
-                    df_comparison,
-                    x='City',
-                    y='PM2.5',
-                    title='😷 PM2.5 Levels Comparison',
-                    color='PM2.5',
-                    color_continuous_scale='Reds',
-                    text='PM2.5'
-                )
-                fig_pm25.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-                fig_pm25.update_layout(showlegend=False, height=400)
-                st.plotly_chart(fig_pm25, use_container_width=True)
-            
-            with col4:
-                fig_humidity = px.bar(
-                    df_comparison,
-                    x='City',
-                    y='Humidity (%)',
-                    title='💧 Humidity Comparison',
-                    color='Humidity (%)',
-                    color_continuous_scale='Blues',
-                    text='Humidity (%)'
-                )
-                fig_humidity.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-                fig_humidity.update_layout(showlegend=False, height=400)
-                st.plotly_chart(fig_humidity, use_container_width=True)
+            # One faceted figure for all four metrics, each panel with its own y-axis
+            chart_titles = {
+                'Temperature (°C)': '🌡️ Temperature Comparison',
+                'AQI': '🌫️ Air Quality Index Comparison',
+                'PM2.5': '😷 PM2.5 Levels Comparison',
+                'Humidity (%)': '💧 Humidity Comparison'
+            }
+            df_long = df_comparison.melt(
+                id_vars='City',
+                value_vars=list(chart_titles),
+                var_name='Metric',
+                value_name='Value'
+            )
+            fig_comparison = px.bar(
+                df_long,
+                x='City',
+                y='Value',
+                color='Metric',
+                facet_col='Metric',
+                facet_col_wrap=2,
+                facet_row_spacing=0.15,
+                color_discrete_sequence=['tomato', 'orange', 'firebrick', 'steelblue'],
+                text='Value'
+            )
+            # Keep each chart's own bar label format (trace names are the metric names)
+            text_formats = {
+                'Temperature (°C)': '%{text:.1f}°C',
+                'AQI': '%{text:.0f}',
+                'PM2.5': '%{text:.1f}',
+                'Humidity (%)': '%{text:.1f}%'
+            }
+            fig_comparison.for_each_trace(lambda t: t.update(texttemplate=text_formats[t.name], textposition='outside'))
+            fig_comparison.update_yaxes(matches=None, showticklabels=True, title_text='')
+            fig_comparison.update_xaxes(title_text='')
+            fig_comparison.for_each_annotation(lambda a: a.update(text=chart_titles[a.text.split('=', 1)[1]]))
+            fig_comparison.update_layout(showlegend=False, height=800)
+            st.plotly_chart(fig_comparison, use_container_width=True)
             
             st.markdown("---")
             
@@ -600,13 +632,15 @@ elif page == "📊 City Comparison":
             col1, col2 = st.columns(2)
             
             with col1:
-                best_aqi_city = df_comparison.loc[df_comparison['AQI'].idxmin(), 'City']
-                best_aqi_val = df_comparison.loc[df_comparison['City'] == best_aqi_city, 'AQI'].values[0]
+                best_aqi_idx = df_comparison['AQI'].idxmin()
+                best_aqi_city = df_comparison.at[best_aqi_idx, 'City']
+                best_aqi_val = df_comparison.at[best_aqi_idx, 'AQI']
                 st.success(f"🌿 **Best Air Quality:** {best_aqi_city} (AQI: {best_aqi_val:.0f})")
             
             with col2:
-                best_temp_city = df_comparison.loc[(df_comparison['Temperature (°C)'] - 25).abs().idxmin(), 'City']
-                best_temp_val = df_comparison.loc[df_comparison['City'] == best_temp_city, 'Temperature (°C)'].values[0]
+                best_temp_idx = (df_comparison['Temperature (°C)'] - 25).abs().idxmin()
+                best_temp_city = df_comparison.at[best_temp_idx, 'City']
+                best_temp_val = df_comparison.at[best_temp_idx, 'Temperature (°C)']
                 st.success(f"🌡️ **Most Comfortable Temperature:** {best_temp_city} ({best_temp_val:.1f}°C)")
     
     elif len(selected_cities) == 0:
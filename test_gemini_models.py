@@ -1,5 +1,7 @@
 import os
-import requests
+import asyncio
+import httpx
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,46 +17,91 @@ api_versions = [
     "https://generativelanguage.googleapis.com/v1beta/models"
 ]
 
-for api_url in api_versions:
-    print(f"\n📋 Checking models at: {api_url}")
+# Test actual generation with available models
+test_models = [
+    ("gemini-2.5-flash", "v1"),
+    ("gemini-2.5-pro", "v1"),
+    ("gemini-2.0-flash", "v1"),
+    ("gemini-2.5-flash", "v1beta"),
+    ("gemini-2.0-flash-exp", "v1beta"),
+]
+
+# Test the exact configuration used in gemini_advice.py (now using gemini-2.0-flash)
+test_url = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+test_prompt = "The temperature is 35°C and AQI is 150. Should I go for a run?"
+
+async def probe(client, method, url, **kwargs):
+    """Send one request; return the response and its body parsed once (None if not JSON)"""
+    response = await client.request(method, url, **kwargs)
     try:
-        response = requests.get(f"{api_url}?key={GEMINI_API_KEY}", timeout=5)
-        response.raise_for_status()
-        models = response.json()
-        
-        if 'models' in models:
+        body = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        body = None
+    return response, body
+
+def error_message(body, default):
+    """Return the API error message from a parsed error body"""
+    if isinstance(body, dict):
+        return body.get('error', {}).get('message', default)
+    return default
+
+async def list_version(client, api_url):
+    """Return (response, body) of ListModels for one API version, with every page's models merged"""
+    params = {"key": GEMINI_API_KEY, "pageSize": 1000}
+    all_models = []
+    while True:
+        response, models = await probe(client, "GET", api_url, params=params, timeout=5)
+        if response.is_error or not isinstance(models, dict) or 'models' not in models:
+            return response, models
+        all_models.extend(models['models'])
+        if not models.get('nextPageToken'):
+            return response, {'models': all_models}
+        params["pageToken"] = models['nextPageToken']
+
+async def list_models(client):
+    """Probe ListModels on each API version
+
+    Returns the generateContent models found and the API versions whose listing succeeded.
+    """
+    list_results = await asyncio.gather(*[
+        list_version(client, api_url) for api_url in api_versions
+    ], return_exceptions=True)
+
+    available = set()
+    listed_versions = set()
+    for api_url, result in zip(api_versions, list_results):
+        print(f"\n📋 Checking models at: {api_url}")
+        api_version = api_url.rsplit('/', 2)[-2]
+        if isinstance(result, Exception):
+            print(f"❌ Error: {result}")
+            continue
+        response, models = result
+        if response.is_error:
+            print(f"❌ HTTP Error: {response.status_code}")
+            print(f"   Response: {response.text[:200]}")
+        elif isinstance(models, dict) and 'models' in models:
             # Filter only models that support generateContent
-            content_models = [m for m in models['models'] 
+            content_models = [m for m in models['models']
                             if 'generateContent' in m.get('supportedGenerationMethods', [])]
             print(f"✅ Found {len(content_models)} models that support generateContent:")
+            listed_versions.add(api_version)
             for model in content_models:
                 name = model.get('name', 'Unknown')
                 print(f"  ✓ {name}")
+                available.add((name.removeprefix('models/'), api_version))
         else:
             print("No models found in response")
-            
-    except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP Error: {e.response.status_code}")
-        print(f"   Response: {e.response.text[:200]}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    return available, listed_versions
 
-print("\n" + "="*50)
-print("\n🧪 Testing actual generation requests...")
+async def run_probes():
+    """Run every probe over one pooled client
 
-# Test actual generation with available models
-test_models = [
-    ("gemini-2.5-flash", "v1"),
-    ("gemini-2.5-pro", "v1"),
-    ("gemini-2.0-flash", "v1"),
-    ("gemini-2.5-flash", "v1beta"),
-    ("gemini-2.0-flash-exp", "v1beta"),
-]
+    A model gets a generation probe when ListModels reported it, or when its
+    API version could not be listed at all.
+    """
+    async with httpx.AsyncClient(timeout=10, headers={"Content-Type": "application/json"}) as client:
+        available, listed_versions = await list_models(client)
 
-for model_name, api_version in test_models:
-    model_url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model_name}:generateContent"
-    print(f"\n Testing: {model_url}")
-    try:
         data = {
             "contents": [{
                 "parts": [{"text": "Say 'Hello' in one word"}]
@@ -63,79 +110,87 @@ for model_name, api_version in test_models:
                 "maxOutputTokens": 10
             }
         }
-        response = requests.post(
-            f"{model_url}?key={GEMINI_API_KEY}",
-            json=data,
-            headers={"Content-Type": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
-        result = response.json()
-        
-        if 'candidates' in result and len(result['candidates']) > 0:
-            text = result['candidates'][0]['content']['parts'][0]['text']
-            print(f"  ✅ SUCCESS! Response: {text.strip()}")
-            print(f"  👉 This model works! Use: {model_name} with API version {api_version}")
-            break
-        else:
-            print(f"  ⚠️ Unexpected response format")
-            
-    except requests.exceptions.HTTPError as e:
-        error_detail = "Unknown error"
-        try:
-            error_json = e.response.json()
-            error_detail = error_json.get('error', {}).get('message', 'Unknown error')
-        except:
-            error_detail = e.response.text[:100]
-        print(f"  ❌ HTTP {e.response.status_code}: {error_detail}")
-    except requests.exceptions.Timeout:
+        listed_models = [m for m in test_models if m in available or m[1] not in listed_versions]
+        model_probes = [
+            probe(client, "POST",
+                  f"https://generativelanguage.googleapis.com/{api_version}/models/{model_name}:generateContent?key={GEMINI_API_KEY}",
+                  json=data)
+            for model_name, api_version in listed_models
+        ]
+        config_data = {
+            "contents": [{
+                "parts": [{"text": test_prompt}]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 150,
+                "topP": 0.8,
+                "topK": 10
+            }
+        }
+        config_probe = probe(client, "POST", test_url, json=config_data)
+
+        results = await asyncio.gather(*model_probes, config_probe, return_exceptions=True)
+    return dict(zip(listed_models, results[:-1])), results[-1]
+
+model_results, config_result = asyncio.run(run_probes())
+
+print("\n" + "="*50)
+print("\n🧪 Testing actual generation requests...")
+
+for model_name, api_version in test_models:
+    model_url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model_name}:generateContent"
+    print(f"\n Testing: {model_url}")
+    if (model_name, api_version) not in model_results:
+        print(f"  ⏭️ Skipped: not listed for {api_version}")
+        continue
+    result = model_results[(model_name, api_version)]
+    if isinstance(result, httpx.TimeoutException):
         print(f"  ❌ Request timed out")
-    except Exception as e:
-        print(f"  ❌ Error: {str(e)[:100]}")
+        continue
+    if isinstance(result, Exception):
+        print(f"  ❌ Error: {str(result)[:100]}")
+        continue
+    response, body = result
+    if response.is_error:
+        error_detail = error_message(body, response.text[:100])
+        print(f"  ❌ HTTP {response.status_code}: {error_detail}")
+    else:
+        # A candidate can come back without parts (e.g. finishReason MAX_TOKENS or SAFETY)
+        try:
+            text = body['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError):
+            print(f"  ⚠️ Unexpected response format")
+            continue
+        print(f"  ✅ SUCCESS! Response: {text.strip()}")
+        print(f"  👉 This model works! Use: {model_name} with API version {api_version}")
+        break
 
 print("\n" + "="*50)
 print("\n📊 Testing your actual gemini_advice.py configuration...")
 
-# Test the exact configuration used in gemini_advice.py (now using gemini-2.0-flash)
-test_url = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
-test_prompt = "The temperature is 35°C and AQI is 150. Should I go for a run?"
-
 print(f"\nTesting with real weather question...")
-try:
-    data = {
-        "contents": [{
-            "parts": [{"text": test_prompt}]
-        }],
-        "generationConfig": {
-            "temperature": 0.7,
-            "maxOutputTokens": 150,
-            "topP": 0.8,
-            "topK": 10
-        }
-    }
-    response = requests.post(test_url, json=data, headers={"Content-Type": "application/json"}, timeout=10)
-    response.raise_for_status()
-    result = response.json()
-    
-    if 'candidates' in result and len(result['candidates']) > 0:
-        advice = result['candidates'][0]['content']['parts'][0]['text']
-        print(f"✅ SUCCESS! Your gemini_advice.py configuration works!")
-        print(f"\nSample advice received:")
-        print("-" * 50)
-        print(advice)
-        print("-" * 50)
+if isinstance(config_result, Exception):
+    print(f"❌ Error: {config_result}")
+else:
+    response, result = config_result
+    if response.is_error:
+        print(f"❌ HTTP Error: {response.status_code}")
+        if isinstance(result, dict):
+            print(f"   Error: {error_message(result, 'Unknown')}")
+        else:
+            print(f"   Response: {response.text[:200]}")
     else:
-        print(f"⚠️ Unexpected response: {result}")
-        
-except requests.exceptions.HTTPError as e:
-    print(f"❌ HTTP Error: {e.response.status_code}")
-    try:
-        error_json = e.response.json()
-        print(f"   Error: {error_json.get('error', {}).get('message', 'Unknown')}")
-    except:
-        print(f"   Response: {e.response.text[:200]}")
-except Exception as e:
-    print(f"❌ Error: {e}")
+        try:
+            advice = result['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError):
+            print(f"⚠️ Unexpected response: {result}")
+        else:
+            print(f"✅ SUCCESS! Your gemini_advice.py configuration works!")
+            print(f"\nSample advice received:")
+            print("-" * 50)
+            print(advice)
+            print("-" * 50)
 
 print("\n" + "="*50)
 print("\n💡 Summary:")
@@ -144,4 +199,4 @@ print("2. If you see errors, check:")
 print("   - Your API key is valid at https://aistudio.google.com/app/apikey")
 print("   - The Gemini API is enabled for your project")
 print("   - You have not exceeded rate limits")
-print("\n3. Run your Streamlit app with: streamlit run streamlit_app.py")
\ No newline at end of file
+print("\n3. Run your Streamlit app with: streamlit run streamlit_app.py")